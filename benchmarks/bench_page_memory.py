@@ -0,0 +1,103 @@
+"""
+Benchmark de memória por página no pdfplumber.
+
+Gera PDFs sintéticos com N páginas de texto e mede o pico de RSS (ru_maxrss),
+em um processo novo por medição, extraindo o texto de todas as páginas:
+  - stream : pdf_parsers.pdf_ouvidoria_parser.iter_pages (libera o cache de cada página)
+  - pages  : laço direto em pdf.pages (cache de todas as páginas fica vivo até fechar o PDF)
+Com o streaming o pico deve ficar praticamente constante, independente de N.
+
+Uso (a partir da raiz do projeto):
+  python benchmarks/bench_page_memory.py
+  python benchmarks/bench_page_memory.py --pages 50 200 800 --lines 60
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHILD = r"""
+import resource, sys
+sys.path.insert(0, {root!r})
+import pdfplumber
+from pdf_parsers.pdf_ouvidoria_parser import iter_pages
+
+path, mode = sys.argv[1], sys.argv[2]
+n = 0
+with pdfplumber.open(path) as pdf:
+    pages = iter_pages(pdf) if mode == "stream" else enumerate(pdf.pages)
+    for _, page in pages:
+        n += len(page.extract_text() or "")
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_text_pdf(path, n_pages, lines_per_page):
+    """PDF mínimo (sem dependências) com `lines_per_page` linhas de texto em cada página."""
+    objects = []  # conteúdo de cada objeto, numerados a partir de 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # preenchido depois
+    kids = []
+    for p in range(n_pages):
+        ops = [b"BT /F1 9 Tf 40 800 Td 11 TL"]
+        for k in range(lines_per_page):
+            ops.append(f"(Pagina {p} linha {k} Reclamacao Elogio Sugestao {p * k}) Tj T*".encode())
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+    objects[pages_id - 1] = (b"<< /Type /Pages /Count %d /Kids [" % n_pages
+                             + b" ".join(b"%d 0 R" % k for k in kids) + b"] >>")
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    Path(path).write_bytes(bytes(out))
+
+
+def peak_rss_mb(pdf_path, mode):
+    code = CHILD.format(root=str(ROOT))
+    proc = subprocess.run([sys.executable, "-c", code, str(pdf_path), mode],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    return int(proc.stdout.strip().splitlines()[-1]) / 1024  # ru_maxrss em KB no Linux
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pico de RSS por número de páginas (stream vs pdf.pages)")
+    ap.add_argument("--pages", type=int, nargs="+", default=[25, 100, 400])
+    ap.add_argument("--lines", type=int, default=60, help="Linhas de texto por página")
+    args = ap.parse_args(argv)
+
+    print(f"{'páginas':>8} {'stream (MB)':>12} {'pdf.pages (MB)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.pages:
+            path = Path(tmp) / f"bench_{n}.pdf"
+            write_text_pdf(path, n, args.lines)
+            stream = peak_rss_mb(path, "stream")
+            plain = peak_rss_mb(path, "pages")
+            print(f"{n:>8} {stream:>12.1f} {plain:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
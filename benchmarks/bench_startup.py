@@ -0,0 +1,96 @@
+"""
+Benchmark de cold start da CLI (python -X importtime).
+
+Roda `python -X importtime main.py <subcomando> --help` em processos novos,
+soma o tempo cumulativo dos imports de nível superior e falha (exit 1) se
+passar do orçamento ou se algum módulo pesado for importado no startup.
+Também importa cada módulo de crawler isoladamente e falha se o import
+puxar algum módulo pesado (eles devem ser importados dentro das funções).
+
+Uso (a partir da raiz do projeto):
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --budget-ms 80 --runs 5 --top 15
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# módulos que não podem ser carregados só para montar a CLI
+HEAVY_MODULES = ["pandas", "pdfplumber", "bs4", "googlesearch", "boto3", "botocore", "lxml", "PIL"]
+
+# `ouvidoria --help` é repassado ao crawler, então inclui o import dele: o módulo não pode
+# puxar requests/dateutil no nível superior (só requests já custa ~100 ms)
+SUBCOMMANDS = [[], ["oferta"], ["noticias"], ["ouvidoria"]]
+LAZY_MODULES = ["crawlers.crawler_pdf_ouvidoria", "crawlers.crawler_headway",
+                "crawlers.crawler_noticias", "utils.s3_uploader"]
+
+IMPORTTIME_RX = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def run_importtime(argv):
+    cmd = [sys.executable, "-X", "importtime", *argv]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise SystemExit(f"Falha ao rodar {' '.join(cmd)}:\n{proc.stderr[-2000:]}")
+
+    modules = []
+    for ln in proc.stderr.splitlines():
+        m = IMPORTTIME_RX.match(ln)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            modules.append((m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return modules, wall_ms
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de startup da CLI")
+    ap.add_argument("--budget-ms", type=float, default=100.0,
+                    help="Orçamento para o tempo total de import (mediana)")
+    ap.add_argument("--runs", type=int, default=5, help="Execuções por subcomando")
+    ap.add_argument("--top", type=int, default=10, help="Quantos imports mais caros listar")
+    args = ap.parse_args(argv)
+
+    falhou = False
+    for sub in SUBCOMMANDS:
+        label = " ".join(["main.py", *sub]) or "main.py"
+        totals, walls, last = [], [], []
+        for _ in range(args.runs):
+            modules, wall_ms = run_importtime([str(ROOT / "main.py"), *sub, "--help"])
+            totals.append(sum(cum for _, _, cum, depth in modules if depth == 0) / 1000)
+            walls.append(wall_ms)
+            last = modules
+
+        import_ms = statistics.median(totals)
+        heavy = sorted({name.split(".")[0] for name, _, _, _ in last} & set(HEAVY_MODULES))
+        ok = import_ms <= args.budget_ms and not heavy
+        falhou |= not ok
+
+        print(f"{'OK  ' if ok else 'FAIL'} {label:<22} imports={import_ms:7.1f} ms  "
+              f"processo={statistics.median(walls):7.1f} ms  (orçamento {args.budget_ms:g} ms)")
+        if heavy:
+            print(f"     módulos pesados no startup: {', '.join(heavy)}")
+        top = sorted((m for m in last if m[3] == 0), key=lambda m: m[2], reverse=True)[:args.top]
+        for name, _, cum, _ in top:
+            print(f"       {cum / 1000:7.1f} ms  {name}")
+
+    for module in LAZY_MODULES:
+        modules, _ = run_importtime(["-c", f"import {module}"])
+        heavy = sorted({name.split(".")[0] for name, _, _, _ in modules} & set(HEAVY_MODULES))
+        falhou |= bool(heavy)
+        print(f"{'FAIL' if heavy else 'OK  '} import {module:<32} "
+              + (f"módulos pesados: {', '.join(heavy)}" if heavy else "sem módulos pesados"))
+
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
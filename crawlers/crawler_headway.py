@@ -1,7 +1,7 @@
-import requests
 import os
 from datetime import datetime
 from urllib.parse import unquote, urlparse
+from utils import http_client, raw_archive
 from utils.s3_uploader import upload_to_s3
 
 
@@ -26,8 +26,10 @@ def baixar_oferta_csv(url, local_path, bucket, s3_key_prefix):
 
     # Fazer download
     print(f"Baixando CSV de {url}...")
-    response = requests.get(url, timeout=30)
+    response = http_client.get(url, timeout=30)
     response.raise_for_status()
+    # cópia bruta comprimida; o arquivo local é apagado após o upload
+    raw_archive.archive_response(response, "oferta")
 
     # Salvar localmente
     with open(unique_local_path, "wb") as f:
@@ -1,12 +1,14 @@
-import requests
-from bs4 import BeautifulSoup
-from googlesearch import search
+from utils import http_client, raw_archive
 
 def buscar_noticias(query, num=10):
+    from bs4 import BeautifulSoup
+    from googlesearch import search
+
     resultados = []
     for url in search(query, num_results=num, lang="pt"):
         try:
-            response = requests.get(url, timeout=5)
+            response = http_client.get(url, timeout=5)
+            raw_archive.archive_response(response, "noticias")
             soup = BeautifulSoup(response.text, 'html.parser')
             titulo = soup.title.string if soup.title else 'Sem título'
             resultados.append({'titulo': titulo.strip(), 'link': url})
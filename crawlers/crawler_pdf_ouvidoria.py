@@ -10,23 +10,14 @@ import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
-import requests
-from bs4 import BeautifulSoup
-import pdfplumber
-import pandas as pd
-
-SESSION = requests.Session()
-SESSION.headers.update({
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/120.0 Safari/537.36"
-})
+# requests, dateutil, bs4, pandas e pdfplumber (via pdf_parsers) são importados só onde
+# são usados, para que importar este módulo (ex.: `main.py ouvidoria --help`) seja barato
+from utils import raw_archive
 
 DATASET_URL = "https://transparencia.metrosp.com.br/dataset/ouvidoria"
+ARCHIVE_SOURCE = "ouvidoria"
 OUT_DIR = Path(__file__).resolve().parents[1] / "data"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 MES_PT = {
     1: "janeiro", 2: "fevereiro", 3: "março", 4: "abril", 5: "maio", 6: "junho",
@@ -35,105 +26,198 @@ MES_PT = {
 MES_PT_NORMALIZADO = {v.replace("ç","c"): k for k,v in MES_PT.items()}
 
 CKAN_PACKAGE_SHOW = "https://transparencia.metrosp.com.br/api/3/action/package_show?id=ouvidoria"
-
-def month_tokens_pt(mes_pt):
-    # gera variações aceitáveis do mês (Setembro, setembro)
-    base = (mes_pt or "").strip()
-    return {base, base.capitalize(), base.lower(), base.upper()}
-
-def ckan_list_resources():
-    r = SESSION.get(CKAN_PACKAGE_SHOW, timeout=30)
+INDEX_PATH = OUT_DIR / "ouvidoria_index.json"
+INDEX_VERSION = 1
+
+MESES_ALT = "|".join(MES_PT_NORMALIZADO)  # janeiro|fevereiro|marco|...
+# títulos/descrições já normalizados: "setembro 2025", "setembro de 2025", "setembro-2025"
+MONTH_YEAR_RX = re.compile(rf"({MESES_ALT})\W{{0,3}}(?:de\s+)?(\d{{4}})")
+# cabeçalho do relatório em PDF: "Setembro/2025"
+REPORT_MONTH_YEAR_RX = re.compile(rf"({MESES_ALT})\s*/\s*(\d{{4}})", re.IGNORECASE)
+
+def _session():
+    # pool + retry/backoff + rate limit por host compartilhados com os demais crawlers
+    from utils.http_client import get_session
+    return get_session()
+
+def ckan_package_show():
+    r = _session().get(CKAN_PACKAGE_SHOW, timeout=30)
     r.raise_for_status()
+    raw_archive.archive_response(r, ARCHIVE_SOURCE)
     data = r.json()
     if not data.get("success"):
-        return []
-    return data["result"].get("resources", []) or []
-
-def ckan_find_month_resources(alvo_mes, alvo_ano):
-    """Filtra os resources da API por mês/ano (tolerante a hífen, espaços, acentos)."""
-    tokens = month_tokens_pt(alvo_mes)
-    year_str = str(alvo_ano)
-    hits = []
-
-    for res in ckan_list_resources():
-        # alguns campos úteis que podem existir
+        return {}
+    return data.get("result") or {}
+
+# === Índice (ano, mês) → recursos candidatos ===
+
+def _norm_text(s):
+    import unicodedata
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return " ".join(s.split()).lower()
+
+def report_month_year(text):
+    """(ano, mês) do cabeçalho "mês/AAAA" no texto extraído do PDF, ou (None, None)."""
+    m = REPORT_MONTH_YEAR_RX.search(text.replace("ç", "c").replace("Ç", "C"))
+    if not m:
+        return None, None
+    return int(m.group(2)), MES_PT_NORMALIZADO[m.group(1).lower()]
+
+def _month_key(ano, mes):
+    return f"{int(ano):04d}-{int(mes):02d}"
+
+def _detect_month_year(text_norm):
+    """(ano, mês) de um título/descrição já normalizado, ou (None, None)."""
+    m = MONTH_YEAR_RX.search(text_norm)
+    if m:
+        return int(m.group(2)), MES_PT_NORMALIZADO[m.group(1)]
+    meses = {MES_PT_NORMALIZADO[t] for t in re.findall(r"[a-z]+", text_norm) if t in MES_PT_NORMALIZADO}
+    anos = set(re.findall(r"\b(20\d{2})\b", text_norm))
+    if len(meses) == 1 and len(anos) == 1:
+        return int(anos.pop()), meses.pop()
+    return None, None
+
+def _is_monthly_report(text_norm):
+    return "ouvidoria" in text_norm and "relatorio mensal" in text_norm
+
+def _candidate_rank(c):
+    # prioriza PDFs explícitos, depois /node/*/download, e o que veio da API antes do HTML
+    return (c["format"] != "pdf", "/node/" not in (c["download_url"] or ""), c["fonte"] != "ckan")
+
+def new_resource_index(metadata_modified=None):
+    return {"versao": INDEX_VERSION, "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "metadata_modified": metadata_modified, "meses": {}}
+
+def _add_candidate(index, ano, mes, cand):
+    bucket = index["meses"].setdefault(_month_key(ano, mes), [])
+    if any(c["page"] == cand["page"] and c["download_url"] == cand["download_url"] for c in bucket):
+        return
+    bucket.append(cand)
+    bucket.sort(key=_candidate_rank)
+
+def index_ckan_resources(index, resources):
+    """Normaliza cada resource uma única vez e o registra sob o (ano, mês) detectado."""
+    for res in resources:
         title = (res.get("title") or res.get("name") or "").strip()
-        desc  = (res.get("description") or "").strip()
         url   = (res.get("url") or "").strip()
         fmt   = (res.get("format") or "").strip().lower()
+        text  = _norm_text(f"{title} {res.get('description') or ''}")
 
-        text = f"{title} {desc}".lower()
-
-        # precisa indicar ser o relatório mensal de ouvidoria do mês/ano
-        cond_mes = any(t.lower() in text for t in tokens)
-        cond_ano = year_str in text
-        cond_ouvidoria = ("ouvidoria" in text)
-        cond_relatorio = ("relatório mensal" in text) or ("relatorio mensal" in text)
-
-        if cond_mes and cond_ano and cond_ouvidoria and cond_relatorio:
-            # priorize PDFs ou "node/*/download"
-            if fmt == "pdf" or url.lower().endswith(".pdf") or "/node/" in url:
-                hits.append({
-                    "title": title, "url": url, "format": fmt,
-                    "page": res.get("page_url") or "",  # alguns CKANs expõem
-                    "id": res.get("id"),
-                })
+        if not _is_monthly_report(text):
+            continue
+        if not (fmt == "pdf" or url.lower().endswith(".pdf") or "/node/" in url):
+            continue
+        ano, mes = _detect_month_year(text)
+        if ano is None:
+            continue
 
-    # ordena para priorizar PDFs explícitos
-    hits.sort(key=lambda x: (x["format"] != "pdf", "/node/" not in x["url"]))
-    return hits
+        rid = res.get("id")
+        page = res.get("page_url") or (f"{DATASET_URL}/resource/{rid}" if rid else url)
+        _add_candidate(index, ano, mes, {
+            "title": title, "url": url, "download_url": absolutize(url) if url else None,
+            "page": page, "format": fmt, "id": rid, "fonte": "ckan",
+            "last_modified": res.get("last_modified") or res.get("metadata_modified"),
+        })
+    return index
+
+def index_html_resources(index, html):
+    """Fallback: indexa as páginas de recurso listadas no HTML do dataset (um único parse)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "lxml")
+    for a in soup.find_all("a", href=True):
+        text = _norm_text(a.get_text())
+        href = absolutize(a["href"])
+        if "/dataset/ouvidoria/resource/" not in href or not _is_monthly_report(text):
+            continue
+        ano, mes = _detect_month_year(text)
+        if ano is None:
+            continue
+        _add_candidate(index, ano, mes, {
+            "title": " ".join(a.get_text().split()), "url": href, "download_url": None,
+            "page": href, "format": "html", "id": href.rstrip("/").rsplit("/", 1)[-1],
+            "fonte": "html", "last_modified": None,
+        })
+    return index
+
+def load_resource_index(path=INDEX_PATH):
+    try:
+        index = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if index.get("versao") != INDEX_VERSION:
+        return None
+    return index
+
+def save_resource_index(index, path=INDEX_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def build_resource_index(with_html=False, pkg=None):
+    """Baixa a listagem do pacote uma vez (ou usa `pkg`) e monta o índice completo."""
+    pkg = pkg if pkg is not None else ckan_package_show()
+    index = new_resource_index(pkg.get("metadata_modified"))
+    index_ckan_resources(index, pkg.get("resources", []) or [])
+    if with_html:
+        index_html_resources(index, fetch(DATASET_URL).text)
+    return index
+
+_RESOURCE_INDEX = None
+
+def get_resource_index(ano=None, mes=None, refresh=False, path=INDEX_PATH):
+    """
+    Índice (ano, mês) → candidatos, persistido em `path` entre execuções.
+    Só baixa/reprocessa a listagem se pedirem refresh ou se o mês pedido não estiver no índice.
+    Retorna (índice, reconstruido): reconstruido=True quando a listagem foi baixada nesta chamada.
+    """
+    global _RESOURCE_INDEX
+    index = None if refresh else (_RESOURCE_INDEX or load_resource_index(path))
+    wanted = _month_key(ano, mes) if ano and mes else None
+
+    rebuilt = index is None or (wanted and wanted not in index["meses"])
+    if rebuilt:
+        index = build_resource_index()
+        if wanted and wanted not in index["meses"]:
+            # a API não listou o mês: tenta o HTML do dataset
+            index_html_resources(index, fetch(DATASET_URL).text)
+        save_resource_index(index, path)
+    _RESOURCE_INDEX = index
+    return index, bool(rebuilt)
+
+def resolve_month_resources(ano, mes, refresh=False):
+    """Candidatos já ranqueados para (ano, mês): lookup direto no índice."""
+    index, _ = get_resource_index(ano, mes, refresh=refresh)
+    return list(index["meses"].get(_month_key(ano, mes), []))
 
 
 def month_minus_two(today=None):
+    from dateutil.relativedelta import relativedelta
     today = today or datetime.now()
     target = today - relativedelta(months=2)
     return target.year, target.month, MES_PT[target.month]
 
 def fetch(url, **kwargs):
-    r = SESSION.get(url, timeout=30, allow_redirects=True, **kwargs)
+    r = _session().get(url, timeout=30, allow_redirects=True, **kwargs)
     r.raise_for_status()
+    raw_archive.archive_response(r, ARCHIVE_SOURCE)
     return r
 
 
-def find_month_resources_html(html, alvo_mes, alvo_ano):
-    """Fallback via HTML se a API CKAN não retornar nada."""
-    soup = BeautifulSoup(html, "lxml")
-    anchors = soup.find_all("a", href=True)
-
-    mes_token = (alvo_mes or "").strip()
-    year_str = str(alvo_ano)
-
-    results = []
-    for a in anchors:
-        txt = (a.get_text() or "").strip()
-        href = a["href"]
-        txt_norm = " ".join(txt.split()).lower()
-
-        # exige "ouvidoria", mês e ano no texto, e 'relatório mensal' (com ou sem acento)
-        if ("ouvidoria" in txt_norm and
-            mes_token.lower() in txt_norm and
-            year_str in txt_norm and
-            ("relatório mensal" in txt_norm or "relatorio mensal" in txt_norm)):
-
-            if href.startswith("/"):
-                href = "https://transparencia.metrosp.com.br" + href
-            if "/dataset/ouvidoria/resource/" in href:
-                results.append(href)
-
-    # remove duplicados preservando ordem
-    return list(dict.fromkeys(results))
-
-
+def _soup(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "lxml")
 
-
-def resolve_download_link(resource_page_html, base_url="https://transparencia.metrosp.com.br"):
+def resolve_download_link(resource_page_html, base_url="https://transparencia.metrosp.com.br", soup=None):
     """
     Na página do recurso, tenta:
       1) Link 'Baixar' (/node/{id}/download)
       2) Qualquer link direto para PDF em /sites/default/files/...
-    Retorna URL absoluta.
+    Retorna URL absoluta. `soup` evita reparsear um HTML já parseado.
     """
-    soup = BeautifulSoup(resource_page_html, "lxml")
+    soup = soup if soup is not None else _soup(resource_page_html)
 
     for a in soup.find_all("a", href=True):
         label = (a.get_text() or "").strip().lower()
@@ -162,8 +246,8 @@ def absolutize(url: str) -> str:
         return "https://transparencia.metrosp.com.br" + url
     return url
 
-def try_extract_pdf_link_from_html(html: str) -> str | None:
-    soup = BeautifulSoup(html, "lxml")
+def try_extract_pdf_link_from_html(html: str, soup=None) -> str | None:
+    soup = soup if soup is not None else _soup(html)
     for a in soup.find_all("a", href=True):
         href = a["href"]
         if href.lower().endswith(".pdf"):
@@ -174,175 +258,164 @@ def try_extract_pdf_link_from_html(html: str) -> str | None:
         return absolutize(m.group(1))
     return None
 
-def download_pdf_or_follow(resource_url: str, download_url: str, referer: str | None, out_path: Path) -> Path:
-    headers = {}
-    if referer:
-        headers["Referer"] = referer
+# === Resolução recurso → URL do PDF (memoizada na execução e persistida entre execuções) ===
 
-    r = SESSION.get(download_url, headers=headers, timeout=30, allow_redirects=True)
-    r.raise_for_status()
-    blob = r.content
+RESOLUTION_CACHE_PATH = OUT_DIR / "ouvidoria_resolucoes.json"
 
-    if is_pdf_bytes(blob) or "application/pdf" in r.headers.get("Content-Type","").lower():
-        out_path.write_bytes(blob)
-        return out_path
-
-    html = blob.decode(errors="ignore")
-    maybe = try_extract_pdf_link_from_html(html)
-    if maybe:
-        r2 = SESSION.get(maybe, headers=headers, timeout=30, allow_redirects=True)
-        r2.raise_for_status()
-        blob2 = r2.content
-        if is_pdf_bytes(blob2) or "application/pdf" in r2.headers.get("Content-Type","").lower():
-            out_path.write_bytes(blob2)
-            return out_path
-
-    res_html = fetch(resource_url).text
-    alt = try_extract_pdf_link_from_html(res_html)
-    if alt:
-        r3 = SESSION.get(alt, headers=headers, timeout=30, allow_redirects=True)
-        r3.raise_for_status()
-        blob3 = r3.content
-        if is_pdf_bytes(blob3) or "application/pdf" in r3.headers.get("Content-Type","").lower():
-            out_path.write_bytes(blob3)
-            return out_path
+_PAGE_HTML = {}
+_PAGE_LINKS = {}
+_RESOLUCOES = None
 
-    raise RuntimeError("Não consegui obter um PDF válido (assinatura %PDF- ausente).")
+def fetch_html(url):
+    """HTML de uma página de recurso; cada URL é baixada no máximo uma vez por execução."""
+    if url not in _PAGE_HTML:
+        _PAGE_HTML[url] = fetch(url).text
+    return _PAGE_HTML[url]
 
-def parse_pdf_to_row(pdf_path):
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text += (page.extract_text(x_tolerance=1, y_tolerance=1) or "") + "\n"
-
-    def get_month_year(t):
-        m = re.search(r"(janeiro|fevereiro|mar[cç]o|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s*/\s*(\d{4})", t, re.IGNORECASE)
-        if not m: 
-            return None, None
-        mes = m.group(1).lower().replace("ç","c")
-        ano = int(m.group(2))
-        return ano, MES_PT_NORMALIZADO.get(mes)
-
-    ano, mes_num = get_month_year(text)
-
-    tot_manifest = None
-    tot_sic = None
-    tot_ovd = None
-
-    m_intro = re.search(r"recebeu\s+(\d{1,5})\s+manifesta[cç][oõ]es.*?sendo\s+(\d{1,5})\s+demandas\s+SIC.*?e\s+(\d{1,5})\s+demandas\s+Ouvidoria", text, re.IGNORECASE | re.DOTALL)
-    if m_intro:
-        tot_manifest = int(m_intro.group(1))
-        tot_sic = int(m_intro.group(2))
-        tot_ovd = int(m_intro.group(3))
-    if tot_sic is None:
-        m_sic = re.search(r"\bSIC\s+(\d{1,5})", text)
-        if m_sic: tot_sic = int(m_sic.group(1))
-    if tot_ovd is None:
-        m_ovd = re.search(r"\bOVD\s+(\d{1,5})", text)
-        if m_ovd: tot_ovd = int(m_ovd.group(1))
-    if tot_manifest is None:
-        m_total = re.search(r"TOTAL GERAL DE MANIFESTA[CÇ][OÕ]ES.*?(\d{2,5})\s*$", text, re.IGNORECASE | re.MULTILINE)
-        if m_total: tot_manifest = int(m_total.group(1))
-
-    def find_count(label):
-        m = re.search(label + r"\s+(\d+)", text, re.IGNORECASE)
-        return int(m.group(1)) if m else None
-
-    tipologia = {
-        "pedido_acesso_informacao": find_count(r"Pedido de acesso à informa[cç][aã]o"),
-        "reclamacao": find_count(r"Reclama[cç][aã]o"),
-        "solicitacao_providencia": find_count(r"Solicita[cç][aã]o de provid[êe]ncia"),
-        "elogio": find_count(r"Elogio"),
-        "sugestao": find_count(r"Sugest[aã]o"),
-        "denuncia": find_count(r"Den[úu]ncia"),
-        "agradecimento": find_count(r"Agradecimento"),
+def page_links(url):
+    """
+    Links da página do recurso: {"download": link 'Baixar', "pdf": link .pdf}.
+    A página é baixada e parseada (um único soup) no máximo uma vez por execução.
+    """
+    if url not in _PAGE_LINKS:
+        html = fetch_html(url)
+        soup = _soup(html)
+        _PAGE_LINKS[url] = {
+            "download": resolve_download_link(html, soup=soup),
+            "pdf": try_extract_pdf_link_from_html(html, soup=soup),
+        }
+    return _PAGE_LINKS[url]
+
+def load_resolution_cache(path=RESOLUTION_CACHE_PATH):
+    global _RESOLUCOES
+    if _RESOLUCOES is None:
+        try:
+            _RESOLUCOES = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _RESOLUCOES = {}
+    return _RESOLUCOES
+
+def save_resolution_cache(path=RESOLUTION_CACHE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(load_resolution_cache(), ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def remember_resolution(resource_id, pdf_url, estrategia):
+    load_resolution_cache()[resource_id] = {
+        "pdf_url": pdf_url, "estrategia": estrategia,
+        "resolvido_em": datetime.now().isoformat(timespec="seconds"),
     }
+    save_resolution_cache()
 
-    m_bloco = re.search(r"CANAIS DE COMUNICA[cç][aã]O\s+(.*?)TEMPO DE RESPOSTA", text, re.IGNORECASE | re.DOTALL)
-    bloco = m_bloco.group(1) if m_bloco else ""
-    def extract_label_numbers(label):
-        vals = []
-        for mm in re.finditer(re.escape(label) + r"\s+(\d{1,4})(?!\s*%)", bloco, re.IGNORECASE):
-            vals.append(int(mm.group(1)))
-        return max(vals) if vals else None
-
-    canais = {
-        "canal_falasp":             extract_label_numbers("Fala.SP"),
-        "canal_fale_conosco":       extract_label_numbers("Fale Conosco"),
-        "canal_central_0800":       extract_label_numbers("Central de Informações (0800)"),
-        "canal_reclame_aqui":       extract_label_numbers("Reclame Aqui"),
-        "canal_procon":             extract_label_numbers("Procon"),
-        "canal_ministerio_publico": extract_label_numbers("Ministério Público"),
-        "canal_redes_sociais":      extract_label_numbers("Redes Sociais"),
-        "canal_email":              extract_label_numbers("E-mail"),
-    }
+def forget_resolution(resource_id):
+    if load_resolution_cache().pop(resource_id, None) is not None:
+        save_resolution_cache()
 
-    m_tempo = re.search(r"tempo m[ée]dio de resposta.*?Ouvidoria.*?(\d+)\s+dias.*?SIC.*?(\d+)\s+dias", text, re.IGNORECASE | re.DOTALL)
-    t_ovd = int(m_tempo.group(1)) if m_tempo else None
-    t_sic = int(m_tempo.group(2)) if m_tempo else None
-
-    row = {
-        "ano": ano, "mes": mes_num,
-        "total_manifestacoes": tot_manifest,
-        "total_sic": tot_sic, "total_ovd": tot_ovd,
-        "tempo_medio_resposta_ovd_dias": t_ovd,
-        "tempo_medio_resposta_sic_dias": t_sic,
-        **tipologia, **canais
-    }
-    return row
+def _get_maybe_pdf(url, headers):
+    """GET; devolve (conteúdo, é_pdf, url_final)."""
+    r = _session().get(url, headers=headers, timeout=30, allow_redirects=True)
+    r.raise_for_status()
+    raw_archive.archive_response(r, ARCHIVE_SOURCE)
+    blob = r.content
+    return blob, is_pdf_bytes(blob) or "application/pdf" in r.headers.get("Content-Type","").lower(), r.url
 
-def main():
-    alvo_ano, alvo_mes_num, alvo_mes_pt = month_minus_two()
-    print(f"Alvo: {alvo_mes_pt.capitalize()} / {alvo_ano}")
+def resolve_and_download(resource_url: str, download_url: str, referer: str | None, out_path: Path):
+    """
+    Tenta, em ordem: download direto → link de PDF no HTML retornado → link de PDF na página do recurso.
+    Retorna (out_path, url_do_pdf, estratégia).
+    """
+    headers = {}
+    if referer:
+        headers["Referer"] = referer
 
-    # 1) Tenta via CKAN API
-    hits = ckan_find_month_resources(alvo_mes_pt, alvo_ano)
+    tried = {download_url}
+    if download_url == resource_url:
+        # sem link 'Baixar': a própria página do recurso já está em cache, não baixa de novo
+        maybe = page_links(resource_url)["pdf"]
+    else:
+        blob, ok, final_url = _get_maybe_pdf(download_url, headers)
+        if ok:
+            out_path.write_bytes(blob)
+            return out_path, final_url, "direto"
+        maybe = try_extract_pdf_link_from_html(blob.decode(errors="ignore"))
+
+    if maybe and maybe not in tried:
+        tried.add(maybe)
+        blob2, ok, final_url = _get_maybe_pdf(maybe, headers)
+        if ok:
+            out_path.write_bytes(blob2)
+            return out_path, final_url, "link_no_download"
 
-    if not hits:
-        # 2) Fallback: HTML
-        ds_html = fetch(DATASET_URL).text
-        recursos_html = find_month_resources_html(ds_html, alvo_mes_pt, alvo_ano)
-        if not recursos_html:
-            print("Nenhum recurso encontrado para o mês/ano alvo.")
-            sys.exit(2)
-        # converte páginas de recurso em pares {title:?, url:?}
-        hits = [{"title": "recurso_html", "url": u, "format": "html", "page": u} for u in recursos_html]
+    alt = page_links(resource_url)["pdf"]
+    if alt and alt not in tried:
+        blob3, ok, final_url = _get_maybe_pdf(alt, headers)
+        if ok:
+            out_path.write_bytes(blob3)
+            return out_path, final_url, "pagina_recurso"
 
-    print("Recursos candidatos encontrados:")
-    for h in hits:
-        print(" -", h.get("title") or "(sem título)", "→", h["url"])
-  
+    raise RuntimeError("Não consegui obter um PDF válido (assinatura %PDF- ausente).")
 
-    rows = []
-    sucesso = False  # opcional, para parar após o primeiro bom
+def download_resource(hit, out_path: Path) -> Path:
+    """
+    Baixa o PDF de um candidato. Usa a resolução salva (id do recurso → URL do PDF) quando existe;
+    senão resolve, grava a estratégia que funcionou e devolve o caminho do PDF.
+    """
+    import requests
+
+    resource_url = hit.get("page") or hit["url"]
+    resource_id = hit.get("id") or resource_url
+    headers = {"Referer": resource_url}
 
-    for resource_url in recursos:
+    cached = load_resolution_cache().get(resource_id)
+    if cached:
         try:
-            print("Recurso:", resource_url)
-            res_html = fetch(resource_url).text
-            download_url = resolve_download_link(res_html) or resource_url
-            print("Download:", download_url)
+            blob, ok, _ = _get_maybe_pdf(cached["pdf_url"], headers)
+            if ok:
+                print(f"Download (cache, {cached['estrategia']}):", cached["pdf_url"])
+                out_path.write_bytes(blob)
+                return out_path
+        except requests.RequestException:
+            pass
+        print("Aviso: resolução em cache não serve mais; resolvendo de novo…")
+        forget_resolution(resource_id)
+
+    download_url = hit.get("download_url")
+    if not download_url:
+        download_url = page_links(resource_url)["download"] or resource_url
+    print("Download:", download_url)
+
+    out_path, pdf_url, estrategia = resolve_and_download(
+        resource_url, download_url, referer=resource_url, out_path=out_path
+    )
+    remember_resolution(resource_id, pdf_url, estrategia)
+    return out_path
+
+def process_month(alvo_ano, alvo_mes_num, hits, workers=1):
+    """Baixa e extrai o primeiro candidato válido do mês. Retorna a linha ou None."""
+    import requests
+    from pdf_parsers.ouvidoria_report_extractor import extract_report, report_to_row, write_report_tables
 
+    for h in hits:
+        resource_url = h.get("page") or h["url"]
+        try:
+            print("Recurso:", resource_url)
             filename = f"ouvidoria_{alvo_ano}_{alvo_mes_num:02d}.pdf"
-            pdf_path = OUT_DIR / filename
-
-            pdf_path = download_pdf_or_follow(
-                resource_url, download_url, referer=resource_url, out_path=pdf_path
-            )
+            pdf_path = download_resource(h, OUT_DIR / filename)
             print("Salvo:", pdf_path)
 
-            row = parse_pdf_to_row(pdf_path)
-            row["ano"] = row.get("ano") or alvo_ano
-            row["mes"] = row.get("mes") or alvo_mes_num
+            # uma única passada no PDF gera todas as tabelas do relatório
+            tables = extract_report(pdf_path, ano=alvo_ano, mes=alvo_mes_num, workers=workers)
+            row = report_to_row(tables)
 
             if not row.get("total_sic") and not row.get("total_ovd"):
                 print("Aviso: parse sem campos essenciais, ignorando este recurso.")
                 continue
 
-            rows.append(row)
-            sucesso = True
-
-            break
+            for p in write_report_tables(tables, OUT_DIR, prefix=f"ouvidoria_{alvo_ano:04d}_{alvo_mes_num:02d}"):
+                print("CSV:", p)
+            return row
 
         except requests.HTTPError as e:
             print(f"Aviso: HTTP {e.response.status_code} em {resource_url}. Seguindo o próximo…")
@@ -350,15 +423,233 @@ def main():
         except Exception as e:
             print(f"Aviso: falha ao processar {resource_url}: {e}. Seguindo o próximo…")
             continue
+    return None
 
-    if not rows:
-        print("Nenhum PDF válido processado para o mês alvo.")
-        sys.exit(2)
+def write_month_csv(ano, mes, row):
+    import pandas as pd
 
-    df = pd.DataFrame(rows)
-    csv_out = OUT_DIR / f"ouvidoria_{alvo_ano:04d}_{alvo_mes_num:02d}.csv"
+    df = pd.DataFrame([row])
+    csv_out = OUT_DIR / f"ouvidoria_{ano:04d}_{mes:02d}.csv"
     df.to_csv(csv_out, index=False, encoding="utf-8")
     print("CSV:", csv_out)
+    return csv_out
+
+
+# === Modo watch: reage a mudanças no pacote CKAN em vez de rodar o pipeline às cegas ===
+
+WATCH_STATE_PATH = OUT_DIR / "ouvidoria_watch.json"
+WATCH_INTERVAL = 900
+
+def _resource_version(res):
+    return [res.get("last_modified") or res.get("metadata_modified"), (res.get("url") or "").strip()]
+
+def load_watch_state(path=WATCH_STATE_PATH):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def save_watch_state(state, path=WATCH_STATE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def changed_resources(state, pkg):
+    """Resources novos ou com last_modified/url diferentes do último estado visto."""
+    seen = (state or {}).get("resources", {})
+    return [res for res in pkg.get("resources", []) or []
+            if res.get("id") and seen.get(res["id"]) != _resource_version(res)]
+
+def poll_once(state, workers=1):
+    """
+    Uma checagem: compara só metadata_modified do pacote e last_modified dos resources.
+    Se algo mudou, baixa/extrai apenas os meses afetados. Retorna o novo estado.
+    """
+    global _RESOURCE_INDEX
+    pkg = ckan_package_show()
+    if not pkg:
+        print("Aviso: package_show sem resultado.")
+        return state
+
+    new_state = {
+        "metadata_modified": pkg.get("metadata_modified"),
+        "verificado_em": datetime.now().isoformat(timespec="seconds"),
+        "resources": {r["id"]: _resource_version(r) for r in pkg.get("resources", []) or [] if r.get("id")},
+    }
+    if state is None:
+        print("Watch: primeiro estado registrado (nada processado).")
+        return new_state
+    if state.get("metadata_modified") == new_state["metadata_modified"]:
+        return {**state, "verificado_em": new_state["verificado_em"]}
+
+    changed = changed_resources(state, pkg)
+    # a listagem já está em mãos: atualiza o índice persistido sem novo download
+    _RESOURCE_INDEX = build_resource_index(pkg=pkg)
+    save_resource_index(_RESOURCE_INDEX)
+
+    afetados = index_ckan_resources(new_resource_index(), changed)["meses"]
+    if not afetados:
+        print(f"Watch: pacote alterado ({len(changed)} resource(s)), nenhum relatório mensal novo.")
+        return new_state
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    for key in sorted(afetados):
+        ano, mes = (int(x) for x in key.split("-"))
+        print(f"Watch: relatório {key} novo/alterado.")
+        for c in afetados[key]:
+            forget_resolution(c["id"])
+        # os resources que mudaram vêm primeiro: um PDF corrigido publicado ao lado do antigo
+        # não pode perder para o antigo só porque este ranqueia melhor
+        novos = {(c["page"], c["download_url"]) for c in afetados[key]}
+        hits = afetados[key] + [c for c in _RESOURCE_INDEX["meses"].get(key, [])
+                                if (c["page"], c["download_url"]) not in novos]
+        row = process_month(ano, mes, hits, workers=workers)
+        if row is None:
+            print(f"Aviso: nenhum PDF válido para {key}; tentará de novo na próxima mudança.")
+            # não marca como visto, para reprocessar na próxima checagem
+            for c in afetados[key]:
+                new_state["resources"].pop(c["id"], None)
+            new_state["metadata_modified"] = None
+            continue
+        write_month_csv(ano, mes, row)
+    return new_state
+
+def watch(interval=WATCH_INTERVAL, once=False, workers=1):
+    import requests
+
+    state = load_watch_state()
+    while True:
+        try:
+            state = poll_once(state, workers=workers)
+            save_watch_state(state)
+        except requests.RequestException as e:
+            print(f"Aviso: falha ao consultar o CKAN: {e}")
+        if once:
+            return
+        time.sleep(interval)
+
+
+def run_target_month(workers=1):
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    alvo_ano, alvo_mes_num, alvo_mes_pt = month_minus_two()
+    print(f"Alvo: {alvo_mes_pt.capitalize()} / {alvo_ano}")
+
+    # índice persistido (CKAN API + fallback HTML); só rebaixa a listagem se o mês não estiver lá
+    index, rebuilt = get_resource_index(alvo_ano, alvo_mes_num)
+    hits = list(index["meses"].get(_month_key(alvo_ano, alvo_mes_num), []))
+    if not hits:
+        print("Nenhum recurso encontrado para o mês/ano alvo.")
+        sys.exit(2)
+
+    print("Recursos candidatos encontrados:")
+    for h in hits:
+        print(" -", h.get("title") or "(sem título)", "→", h["url"])
+
+    row = process_month(alvo_ano, alvo_mes_num, hits, workers=workers)
+    if row is None and not rebuilt:
+        # o índice salvo pode estar desatualizado (recurso substituído no portal)
+        print("Aviso: candidatos do índice falharam; atualizando o índice…")
+        hits = resolve_month_resources(alvo_ano, alvo_mes_num, refresh=True)
+        row = process_month(alvo_ano, alvo_mes_num, hits, workers=workers)
+
+    if row is None:
+        print("Nenhum PDF válido processado para o mês alvo.")
+        sys.exit(2)
+
+    write_month_csv(alvo_ano, alvo_mes_num, row)
+
+
+# === Reprocessamento offline a partir do arquivo bruto (utils.raw_archive) ===
+
+def _reparse_archived_pdf(sha):
+    # roda no worker: descomprime o objeto para um temporário e extrai as tabelas
+    import tempfile
+    from pdf_parsers.ouvidoria_report_extractor import extract_report
+
+    # um objeto truncado/corrompido passa pela assinatura %PDF-: só ele é pulado, não a reexecução toda
+    try:
+        blob = raw_archive.read_object(sha)
+        if not is_pdf_bytes(blob):
+            return sha, None
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / f"{sha}.pdf"
+            path.write_bytes(blob)
+            return sha, extract_report(path)
+    except Exception as e:
+        print(f"Aviso: não consegui reprocessar {sha[:12]}: {type(e).__name__}: {e}")
+        return sha, None
+
+def reparse_archive(workers=1, out_dir=None):
+    """
+    Reexecuta a extração sobre todos os PDFs já arquivados, sem acessar o portal.
+    Cada PDF distinto (sha256) é processado uma vez; `workers` processos em paralelo.
+    Grava ouvidoria_historico_<tabela>.csv com a coluna sha256 ligando ao manifest.
+    """
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+    from pdf_parsers.ouvidoria_report_extractor import TABLES, write_report_tables
+
+    out_dir = Path(out_dir or OUT_DIR)
+    # páginas HTML e JSON do CKAN ficam de fora; o worker ainda confere a assinatura %PDF-
+    shas = list(dict.fromkeys(
+        e["sha256"] for e in raw_archive.iter_manifest(ARCHIVE_SOURCE)
+        if not any(t in (e.get("content_type") or "").lower() for t in ("html", "json"))
+    ))
+    if not shas:
+        print("Nenhum PDF no arquivo bruto.")
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [_reparse_archived_pdf(sha) for sha in shas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_reparse_archived_pdf, shas))
+
+    batches = {name: [] for name in TABLES}
+    ignorados = []
+    for sha, tables in results:
+        if tables is None:
+            ignorados.append(sha)
+            continue
+        print(f"Reprocessado: {sha[:12]}")
+        for name in TABLES:
+            batches[name].append(tables[name].assign(sha256=sha))
+
+    merged = {name: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+              for name, frames in batches.items()}
+    paths = write_report_tables(merged, out_dir, prefix="ouvidoria_historico")
+    for p in paths:
+        print("CSV:", p)
+    if ignorados:
+        print(f"Aviso: {len(ignorados)} objeto(s) ignorado(s) (não é PDF ou falhou a extração):")
+        for sha in ignorados:
+            print(" -", sha)
+    return paths
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Relatório mensal da Ouvidoria (CKAN → PDF → CSVs)")
+    ap.add_argument("--watch", action="store_true",
+                    help="Consulta o metadata_modified do pacote periodicamente e processa só o que mudou")
+    ap.add_argument("--interval", type=int, default=WATCH_INTERVAL, help="Intervalo entre checagens (s)")
+    ap.add_argument("--once", action="store_true", help="Com --watch: faz uma única checagem (cron)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Processos para extrair as páginas do PDF em paralelo (0 = todos os núcleos)")
+    ap.add_argument("--reparse-archive", action="store_true",
+                    help="Reprocessa offline todos os PDFs do arquivo bruto (--workers = PDFs em paralelo)")
+    args = ap.parse_args(argv)
+
+    if args.reparse_archive:
+        reparse_archive(workers=args.workers)
+    elif args.watch:
+        watch(interval=args.interval, once=args.once, workers=args.workers)
+    else:
+        run_target_month(workers=args.workers)
 
 
 if __name__ == "__main__":
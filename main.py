@@ -1,28 +1,109 @@
+"""
+CLI dos crawlers do Metrô.
+
+  python main.py                  # oferta + notícias (comportamento original)
+  python main.py oferta           # CSV de oferta → S3
+  python main.py noticias         # busca de notícias
+  python main.py ouvidoria        # relatório mensal da Ouvidoria (PDF → CSVs)
+  python main.py ouvidoria --watch [--interval 900] [--once]
+  python main.py parse <pdf> ...  # mesmos argumentos de pdf_parsers/pdf_ouvidoria_parser.py
+
+Os módulos pesados (pandas, pdfplumber, bs4, googlesearch, boto3) só são importados
+dentro do subcomando que precisa deles: o cold start fica barato nos containers do cron.
+Benchmark de startup: python benchmarks/bench_startup.py
+"""
+
+import argparse
 import os
-from crawlers.crawler_headway import baixar_oferta_csv
-from crawlers.crawler_noticias import buscar_noticias
-from dotenv import load_dotenv
+import sys
+
+NOTICIAS_QUERY = "Metrô São Paulo site:g1.globo.com"
+
+
+def _load_env():
+    # Carregar variáveis do .env
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def cmd_oferta(args):
+    from crawlers.crawler_headway import baixar_oferta_csv
+
+    url = os.environ.get("METRO_OFERTA_URL")
+    local_path = os.environ.get("METRO_LOCAL_PATH")
+    s3_bucket = os.environ.get("METRO_S3_BUCKET")
+    s3_key_prefix = os.environ.get("METRO_S3_KEY_PREFIX")
+
+    if not s3_bucket:
+        raise RuntimeError("A variável METRO_S3_BUCKET deve ser definida no ambiente.")
+
+    baixar_oferta_csv(url, local_path, s3_bucket, s3_key_prefix)
+
+
+def cmd_noticias(args):
+    from crawlers.crawler_noticias import buscar_noticias
+
+    noticias = buscar_noticias(args.query, num=args.num)
+    if not noticias:
+        print("Nenhuma notícia encontrada.")
+    else:
+        for noticia in noticias:
+            print(f"📰 {noticia['titulo']}")
+            print(f"🔗 {noticia['link']}\n")
+
+
+def cmd_ouvidoria(args):
+    from crawlers import crawler_pdf_ouvidoria
+    crawler_pdf_ouvidoria.main(args.args)
+
+
+def cmd_parse(args):
+    from pdf_parsers import pdf_ouvidoria_parser
+    pdf_ouvidoria_parser.main(args.args)
+
+
+def cmd_default(args):
+    # === CRAWLER DE OFERTA ===
+    cmd_oferta(args)
+    # === CRAWLER DE NOTÍCIAS ===
+    cmd_noticias(argparse.Namespace(query=NOTICIAS_QUERY, num=10))
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Crawlers do Metrô de São Paulo")
+    ap.set_defaults(func=cmd_default)
+    sub = ap.add_subparsers(dest="comando")
+
+    p = sub.add_parser("oferta", help="Baixa o CSV de oferta e envia para o S3")
+    p.set_defaults(func=cmd_oferta)
+
+    p = sub.add_parser("noticias", help="Busca notícias sobre o Metrô")
+    p.add_argument("--query", default=NOTICIAS_QUERY, help="Consulta de busca")
+    p.add_argument("--num", type=int, default=10, help="Número de resultados")
+    p.set_defaults(func=cmd_noticias)
 
-# Carregar variáveis do .env
-load_dotenv()
+    # ouvidoria e parse repassam os argumentos como estão para o módulo (inclusive --help)
+    p = sub.add_parser("ouvidoria", add_help=False,
+                       help="Baixa e extrai o relatório mensal da Ouvidoria (--watch para modo contínuo)")
+    p.set_defaults(func=cmd_ouvidoria, passthrough=True)
 
-URL = os.environ.get("METRO_OFERTA_URL")
-LOCAL_PATH = os.environ.get("METRO_LOCAL_PATH")
-S3_BUCKET = os.environ.get("METRO_S3_BUCKET")
-S3_KEY_PREFIX = os.environ.get("METRO_S3_KEY_PREFIX")
+    p = sub.add_parser("parse", add_help=False,
+                       help="Extrai a tipologia de um PDF (argumentos do pdf_ouvidoria_parser)")
+    p.set_defaults(func=cmd_parse, passthrough=True)
+    return ap
 
-if not S3_BUCKET:
-    raise RuntimeError("A variável METRO_S3_BUCKET deve ser definida no ambiente.")
 
-baixar_oferta_csv(URL, LOCAL_PATH, S3_BUCKET, S3_KEY_PREFIX)
+def main(argv=None):
+    ap = build_parser()
+    args, rest = ap.parse_known_args(argv)
+    if getattr(args, "passthrough", False):
+        args.args = rest
+    elif rest:
+        ap.error(f"argumentos não reconhecidos: {' '.join(rest)}")
+    # antes de importar qualquer crawler: alguns leem o ambiente ao carregar/rodar
+    _load_env()
+    return args.func(args)
 
-# === CRAWLER DE NOTÍCIAS ===
-query = "Metrô São Paulo site:g1.globo.com"
-noticias = buscar_noticias(query)
 
-if not noticias:
-    print("Nenhuma notícia encontrada.")
-else:
-    for noticia in noticias:
-        print(f"📰 {noticia['titulo']}")
-        print(f"🔗 {noticia['link']}\n")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Extração completa de um relatório mensal da Ouvidoria em uma única abertura do PDF.
+
+Percorre cada página uma vez e emite tabelas relacionadas em formato longo,
+todas com a chave (ano, mes):
+  - resumo          : totais (manifestações, SIC, OVD) e tempos médios de resposta
+  - tipologia       : categoria, quantidade (inclui TOTAL GERAL)
+  - canais          : canal, quantidade
+  - tempo_resposta  : tipo (ovd/sic), dias
+  - detalhamento    : seções por linha/estação (secao, item, quantidade)
+
+Substitui a combinação crawler (regex sobre o texto) + pdf_ouvidoria_parser (tipologia),
+que abriam e percorriam o mesmo PDF duas vezes.
+
+Exemplo de uso (a partir da raiz do projeto):
+  python -m pdf_parsers.ouvidoria_report_extractor data/ouvidoria_2025_09.pdf -o data/relatorio
+"""
+
+import argparse
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from crawlers.crawler_pdf_ouvidoria import report_month_year
+from pdf_parsers.pdf_ouvidoria_parser import (
+    HEADER_RX, TOTAL_GERAL_RX, import_pdfplumber, extract_pages_text, iter_pages,
+    parse_by_layout, parse_from_text, normalize_and_sort,
+)
+
+TABLES = ["resumo", "tipologia", "canais", "tempo_resposta", "detalhamento"]
+
+# categoria canônica → coluna na linha "larga" do crawler
+TIPOLOGIA_COLUNAS = {
+    "Pedido de acesso à informação": "pedido_acesso_informacao",
+    "Reclamação": "reclamacao",
+    "Solicitação de providência": "solicitacao_providencia",
+    "Elogio": "elogio",
+    "Sugestão": "sugestao",
+    "Denúncia": "denuncia",
+    "Agradecimento": "agradecimento",
+}
+TIPOLOGIA_RX = {
+    "Pedido de acesso à informação": r"Pedido de acesso à informa[cç][aã]o",
+    "Reclamação": r"Reclama[cç][aã]o",
+    "Solicitação de providência": r"Solicita[cç][aã]o de provid[êe]ncia",
+    "Elogio": r"Elogio",
+    "Sugestão": r"Sugest[aã]o",
+    "Denúncia": r"Den[úu]ncia",
+    "Agradecimento": r"Agradecimento",
+}
+
+# coluna na linha "larga" → rótulo no relatório
+CANAIS = {
+    "canal_falasp": "Fala.SP",
+    "canal_fale_conosco": "Fale Conosco",
+    "canal_central_0800": "Central de Informações (0800)",
+    "canal_reclame_aqui": "Reclame Aqui",
+    "canal_procon": "Procon",
+    "canal_ministerio_publico": "Ministério Público",
+    "canal_redes_sociais": "Redes Sociais",
+    "canal_email": "E-mail",
+}
+
+DETALHE_SECAO_RX = re.compile(r"\bLINHAS?\b|\bESTA[CÇ](?:[AÃ]O|[OÕ]ES)\b", re.IGNORECASE)
+DETALHE_ROW_RX = re.compile(r"^(?P<item>\D.*?)\s+(?P<num>\d{1,6})$")
+
+
+def _is_heading(line):
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 6 and all(c.isupper() for c in letters) and not DETALHE_ROW_RX.match(line)
+
+
+def _totais(text):
+    tot_manifest = tot_sic = tot_ovd = None
+    m_intro = re.search(r"recebeu\s+(\d{1,5})\s+manifesta[cç][oõ]es.*?sendo\s+(\d{1,5})\s+demandas\s+SIC.*?e\s+(\d{1,5})\s+demandas\s+Ouvidoria",
+                        text, re.IGNORECASE | re.DOTALL)
+    if m_intro:
+        tot_manifest, tot_sic, tot_ovd = (int(g) for g in m_intro.groups())
+    if tot_sic is None:
+        m_sic = re.search(r"\bSIC\s+(\d{1,5})", text)
+        if m_sic: tot_sic = int(m_sic.group(1))
+    if tot_ovd is None:
+        m_ovd = re.search(r"\bOVD\s+(\d{1,5})", text)
+        if m_ovd: tot_ovd = int(m_ovd.group(1))
+    if tot_manifest is None:
+        m_total = re.search(r"TOTAL GERAL DE MANIFESTA[CÇ][OÕ]ES.*?(\d{2,5})\s*$", text, re.IGNORECASE | re.MULTILINE)
+        if m_total: tot_manifest = int(m_total.group(1))
+    return tot_manifest, tot_sic, tot_ovd
+
+
+def _tipologia_from_text(text):
+    """Fallback sem cabeçalho de tipologia: mesma saída de parse_from_text, inclusive o TOTAL GERAL."""
+    rows = []
+    for canon, rx in TIPOLOGIA_RX.items():
+        m = re.search(rx + r"\s+(\d+)", text, re.IGNORECASE)
+        if m:
+            rows.append({"categoria": canon, "quantidade": int(m.group(1))})
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows)
+    # só a linha "TOTAL GERAL <n>" (não "TOTAL GERAL DE MANIFESTAÇÕES ..."); senão, soma
+    m_total = re.search(TOTAL_GERAL_RX.pattern + r"\s+(\d{1,6})\s*$", text, re.IGNORECASE | re.MULTILINE)
+    total = int(m_total.group(1)) if m_total else int(df["quantidade"].sum())
+    df.loc[len(df)] = {"categoria": "TOTAL GERAL", "quantidade": total}
+    return df
+
+
+def _canais(text):
+    m_bloco = re.search(r"CANAIS DE COMUNICA[cç][aã]O\s+(.*?)TEMPO DE RESPOSTA", text, re.IGNORECASE | re.DOTALL)
+    bloco = m_bloco.group(1) if m_bloco else ""
+    rows = []
+    for label in CANAIS.values():
+        vals = [int(mm.group(1)) for mm in
+                re.finditer(re.escape(label) + r"\s+(\d{1,4})(?!\s*%)", bloco, re.IGNORECASE)]
+        if vals:
+            rows.append({"canal": label, "quantidade": max(vals)})
+    return rows
+
+
+def _tempo_resposta(text):
+    m_tempo = re.search(r"tempo m[ée]dio de resposta.*?Ouvidoria.*?(\d+)\s+dias.*?SIC.*?(\d+)\s+dias",
+                        text, re.IGNORECASE | re.DOTALL)
+    if not m_tempo:
+        return []
+    return [{"tipo": "ovd", "dias": int(m_tempo.group(1))},
+            {"tipo": "sic", "dias": int(m_tempo.group(2))}]
+
+
+def _detalhamento(page_text, page_number, state):
+    """Linhas 'item  N' dentro de seções por linha/estação. `state` carrega a seção entre páginas."""
+    rows = []
+    for raw in page_text.splitlines():
+        s = " ".join(raw.split())
+        if not s or "%" in s:
+            continue
+        if _is_heading(s):
+            state["secao"] = s if DETALHE_SECAO_RX.search(s) else None
+            continue
+        if state.get("secao") is None or TOTAL_GERAL_RX.search(s):
+            continue
+        m = DETALHE_ROW_RX.match(s)
+        if m:
+            rows.append({"pagina": page_number, "secao": state["secao"],
+                         "item": m.group("item").strip(" .:-"), "quantidade": int(m.group("num"))})
+    return rows
+
+
+def extract_report(pdf_path, ano=None, mes=None, workers=1) -> dict:
+    """
+    Abre o PDF uma vez, percorre cada página uma vez e devolve {nome_tabela: DataFrame}.
+    `ano`/`mes` são usados quando o período não aparece no texto do relatório.
+    Com `workers` != 1 o texto das páginas é extraído em paralelo (faixas de páginas por processo).
+    """
+    pdfplumber = import_pdfplumber()
+    tipologia = pd.DataFrame()
+
+    def tipologia_da_pagina(page, t):
+        df = parse_by_layout(page)
+        return df if not df.empty else parse_from_text(t)
+
+    if workers != 1:
+        # o texto já vem dos workers: no processo principal só abre a(s) página(s) com o cabeçalho
+        texts = extract_pages_text(pdf_path, workers=workers, x_tolerance=1, y_tolerance=1)
+        header_pages = [i for i, t in enumerate(texts) if HEADER_RX.search(t)]
+        if header_pages:
+            with pdfplumber.open(pdf_path) as pdf:
+                for i, page in iter_pages(pdf, header_pages):
+                    tipologia = tipologia_da_pagina(page, texts[i])
+                    if not tipologia.empty:
+                        break
+    else:
+        texts = []
+        with pdfplumber.open(pdf_path) as pdf:
+            for i, page in iter_pages(pdf):
+                t = page.extract_text(x_tolerance=1, y_tolerance=1) or ""
+                texts.append(t)
+                if tipologia.empty and HEADER_RX.search(t):
+                    tipologia = tipologia_da_pagina(page, t)
+
+    detalhe_rows, detalhe_state = [], {}
+    for i, t in enumerate(texts):
+        detalhe_rows.extend(_detalhamento(t, i + 1, detalhe_state))
+
+    text = "\n".join(texts)
+    ano_txt, mes_txt = report_month_year(text)
+    ano, mes = ano_txt or ano, mes_txt or mes
+    key = {"ano": ano, "mes": mes}
+
+    if tipologia.empty:
+        tipologia = _tipologia_from_text(text)
+    tipologia = normalize_and_sort(tipologia)
+
+    tot_manifest, tot_sic, tot_ovd = _totais(text)
+    tempo = _tempo_resposta(text)
+    tempo_por_tipo = {r["tipo"]: r["dias"] for r in tempo}
+
+    resumo = pd.DataFrame([{
+        **key,
+        "total_manifestacoes": tot_manifest,
+        "total_sic": tot_sic, "total_ovd": tot_ovd,
+        "tempo_medio_resposta_ovd_dias": tempo_por_tipo.get("ovd"),
+        "tempo_medio_resposta_sic_dias": tempo_por_tipo.get("sic"),
+        "paginas": len(texts),
+    }])
+
+    def long_table(rows, columns):
+        df = pd.DataFrame(rows, columns=columns)
+        df.insert(0, "mes", mes)
+        df.insert(0, "ano", ano)
+        return df
+
+    return {
+        "resumo": resumo,
+        "tipologia": long_table(tipologia.to_dict("records"), ["categoria", "quantidade"]),
+        "canais": long_table(_canais(text), ["canal", "quantidade"]),
+        "tempo_resposta": long_table(tempo, ["tipo", "dias"]),
+        "detalhamento": long_table(detalhe_rows, ["pagina", "secao", "item", "quantidade"]),
+    }
+
+
+def report_to_row(tables) -> dict:
+    """Achata as tabelas na linha única usada pelo crawler (ouvidoria_AAAA_MM.csv)."""
+    row = tables["resumo"].drop(columns=["paginas"]).iloc[0].to_dict()
+
+    tip = tables["tipologia"]
+    qtd = dict(zip(tip["categoria"].astype(str), tip["quantidade"]))
+    for canon, col in TIPOLOGIA_COLUNAS.items():
+        row[col] = qtd.get(canon)
+
+    can = tables["canais"]
+    qtd = dict(zip(can["canal"], can["quantidade"]))
+    for col, label in CANAIS.items():
+        row[col] = qtd.get(label)
+    return row
+
+
+def write_report_tables(tables, out_dir, prefix="ouvidoria") -> list:
+    """Grava cada tabela em {out_dir}/{prefix}_{tabela}.csv."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name in TABLES:
+        path = out_dir / f"{prefix}_{name}.csv"
+        tables[name].to_csv(path, index=False, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Extrai todas as tabelas dos relatórios da Ouvidoria")
+    ap.add_argument("pdf", nargs="+", help="Caminho(s) do(s) PDF(s)")
+    ap.add_argument("-o", "--output-dir", default="data", help="Diretório de saída dos CSVs")
+    ap.add_argument("--prefix", default="ouvidoria", help="Prefixo dos arquivos de saída")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Processos por PDF para extrair as páginas em paralelo (0 = todos os núcleos)")
+    args = ap.parse_args(argv)
+
+    batches = {name: [] for name in TABLES}
+    for path in args.pdf:
+        tables = extract_report(path, workers=args.workers)
+        for name in TABLES:
+            batches[name].append(tables[name])
+        print(f"OK: {path}")
+
+    merged = {name: pd.concat(frames, ignore_index=True) for name, frames in batches.items()}
+    for p in write_report_tables(merged, args.output_dir, prefix=args.prefix):
+        print(f"CSV: {p}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Validação em lote dos dados extraídos dos relatórios da Ouvidoria.
+
+Junta vários meses em um único DataFrame e roda as verificações de forma vetorizada:
+  - soma das categorias da tipologia == TOTAL GERAL
+  - total_sic + total_ovd == total_manifestacoes
+  - variação mês a mês fora do esperado (outliers)
+O resultado é um relatório estruturado (JSON ou CSV) com uma linha por verificação.
+
+Exemplo de uso (a partir da raiz do projeto):
+  python -m pdf_parsers.ouvidoria_validation \\
+      --tipologia data/tipologia_totais_*.csv \\
+      --totais data/ouvidoria_*.csv \\
+      -o data/validacao_ouvidoria.json
+
+Os CSVs de tipologia não trazem ano/mês: quando as colunas não existem,
+são inferidos do nome do arquivo (ex.: tipologia_totais_2025_09.csv).
+"""
+
+import argparse
+import glob
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from pdf_parsers.pdf_ouvidoria_parser import ORDER, canonicalize_labels
+
+CATEGORIAS = ORDER[:-1]
+TOTAL_GERAL = ORDER[-1]
+CAMPOS_TOTAIS = ["total_manifestacoes", "total_sic", "total_ovd"]
+REPORT_COLUMNS = ["ano", "mes", "verificacao", "campo", "esperado", "obtido", "status"]
+
+FILENAME_PERIOD_RX = re.compile(r"(\d{4})[_-](\d{1,2})(?!\d)")
+
+
+def _period_from_filename(path):
+    m = FILENAME_PERIOD_RX.search(Path(path).stem)
+    if not m:
+        return None, None
+    return int(m.group(1)), int(m.group(2))
+
+
+def _read_batch(paths, required):
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, encoding="utf-8-sig")
+        if not required.issubset(df.columns):
+            print(f"[WARN] {path}: colunas esperadas ausentes ({sorted(required)}), ignorando.")
+            continue
+        if "ano" not in df.columns or "mes" not in df.columns:
+            ano, mes = _period_from_filename(path)
+            if ano is None:
+                print(f"[WARN] {path}: sem colunas ano/mes e sem AAAA_MM no nome, ignorando.")
+                continue
+            df["ano"], df["mes"] = ano, mes
+        elif df[["ano", "mes"]].isna().any(axis=None):
+            # o extrator grava ano/mes vazios quando o período não aparece no texto do PDF
+            ano, mes = _period_from_filename(path)
+            if ano is not None:
+                df["ano"] = df["ano"].fillna(ano)
+                df["mes"] = df["mes"].fillna(mes)
+        df["arquivo"] = str(path)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def load_tipologia(paths) -> pd.DataFrame:
+    """Lê CSVs de tipologia (categoria, quantidade) em formato longo com ano/mes."""
+    df = _read_batch(paths, {"categoria", "quantidade"})
+    if df.empty:
+        return pd.DataFrame(columns=["ano", "mes", "categoria", "quantidade"])
+    df["categoria"] = canonicalize_labels(df["categoria"])
+    df["quantidade"] = pd.to_numeric(df["quantidade"], errors="coerce")
+    return df[["ano", "mes", "categoria", "quantidade"]]
+
+
+def load_totais(paths) -> pd.DataFrame:
+    """
+    Lê os CSVs do crawler (uma linha por mês, colunas total_*).
+    O glob ouvidoria_*.csv também pega ouvidoria_AAAA_MM_resumo.csv e ouvidoria_historico_resumo.csv,
+    que repetem os mesmos meses: fica uma linha por (ano, mes), a do último arquivo lido.
+    """
+    df = _read_batch(paths, set(CAMPOS_TOTAIS))
+    if df.empty:
+        return pd.DataFrame(columns=["ano", "mes", *CAMPOS_TOTAIS])
+    for c in CAMPOS_TOTAIS:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    sem_periodo = df["ano"].isna() | df["mes"].isna()
+    com_periodo = df[~sem_periodo].drop_duplicates(subset=["ano", "mes"], keep="last")
+    return pd.concat([com_periodo, df[sem_periodo]], ignore_index=True)
+
+
+def _status(esperado: pd.Series, obtido: pd.Series) -> pd.Series:
+    st = pd.Series("falha", index=esperado.index)
+    st[esperado == obtido] = "ok"
+    st[esperado.isna() | obtido.isna()] = "sem_dados"
+    return st
+
+
+def check_soma_total(tipologia: pd.DataFrame) -> pd.DataFrame:
+    """Soma das 7 categorias == TOTAL GERAL, para todos os meses de uma vez."""
+    if tipologia.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    wide = tipologia.pivot_table(index=["ano", "mes"], columns="categoria",
+                                 values="quantidade", aggfunc="sum")
+    wide = wide.reindex(columns=ORDER)
+    out = pd.DataFrame({
+        "esperado": wide[TOTAL_GERAL],
+        "obtido": wide[CATEGORIAS].sum(axis=1, min_count=1),
+    }).reset_index()
+    out["verificacao"] = "soma_categorias_igual_total_geral"
+    out["campo"] = TOTAL_GERAL
+    out["status"] = _status(out["esperado"], out["obtido"])
+    return out[REPORT_COLUMNS]
+
+
+def check_totais(totais: pd.DataFrame) -> pd.DataFrame:
+    """total_sic + total_ovd == total_manifestacoes."""
+    if totais.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    out = totais[["ano", "mes"]].copy()
+    out["esperado"] = totais["total_manifestacoes"]
+    out["obtido"] = totais["total_sic"] + totais["total_ovd"]
+    out["verificacao"] = "sic_mais_ovd_igual_total"
+    out["campo"] = "total_manifestacoes"
+    out["status"] = _status(out["esperado"], out["obtido"])
+    return out[REPORT_COLUMNS]
+
+
+def check_outliers(tipologia: pd.DataFrame, totais: pd.DataFrame,
+                   max_variacao=0.5, min_base=20) -> pd.DataFrame:
+    """
+    Variação mês a mês por campo (categorias e totais). Só compara meses consecutivos
+    e só marca falha quando o mês anterior tem pelo menos `min_base` manifestações.
+    """
+    series = []
+    if not tipologia.empty:
+        series.append(tipologia.rename(columns={"categoria": "campo", "quantidade": "valor"})
+                      [["ano", "mes", "campo", "valor"]])
+    if not totais.empty:
+        series.append(totais.melt(id_vars=["ano", "mes"], value_vars=CAMPOS_TOTAIS,
+                                  var_name="campo", value_name="valor"))
+    if not series:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    # linhas sem período (relatório sem "mês/AAAA" no texto) não entram na comparação mês a mês
+    long = (pd.concat(series, ignore_index=True)
+            .dropna(subset=["valor", "ano", "mes"])
+            .drop_duplicates(subset=["ano", "mes", "campo"], keep="last"))
+    long["periodo"] = long["ano"].astype(int) * 12 + long["mes"].astype(int)
+    long = long.sort_values(["campo", "periodo"])
+
+    g = long.groupby("campo", sort=False)
+    prev = g["valor"].shift(1)
+    consecutivo = (long["periodo"] - g["periodo"].shift(1)) == 1
+    mask = consecutivo & (prev >= min_base)
+
+    out = long.loc[mask, ["ano", "mes", "campo"]].copy()
+    out["esperado"] = prev[mask]
+    out["obtido"] = long.loc[mask, "valor"]
+    variacao = (out["obtido"] - out["esperado"]).abs() / out["esperado"]
+    out["verificacao"] = "variacao_mes_a_mes"
+    out["status"] = "ok"
+    out.loc[variacao > max_variacao, "status"] = "falha"
+    return out[REPORT_COLUMNS]
+
+
+def validate_batch(tipologia=None, totais=None, max_variacao=0.5, min_base=20) -> pd.DataFrame:
+    """Roda todas as verificações sobre o lote e devolve o relatório em formato longo."""
+    tipologia = tipologia if tipologia is not None else pd.DataFrame(columns=["ano", "mes", "categoria", "quantidade"])
+    totais = totais if totais is not None else pd.DataFrame(columns=["ano", "mes", *CAMPOS_TOTAIS])
+    parts = [
+        check_soma_total(tipologia),
+        check_totais(totais),
+        check_outliers(tipologia, totais, max_variacao=max_variacao, min_base=min_base),
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = pd.concat(parts, ignore_index=True)
+    return report.sort_values(["ano", "mes", "verificacao", "campo"]).reset_index(drop=True)
+
+
+def write_validation_report(report: pd.DataFrame, path) -> Path:
+    """Grava o relatório em .csv ou .json (com resumo) conforme a extensão."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        report.to_csv(path, index=False, encoding="utf-8")
+        return path
+
+    records = json.loads(report.to_json(orient="records", force_ascii=False))
+    payload = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "resumo": {
+            "verificacoes": int(len(report)),
+            "falhas": int((report["status"] == "falha").sum()),
+            "sem_dados": int((report["status"] == "sem_dados").sum()),
+            "meses": int(report[["ano", "mes"]].drop_duplicates().shape[0]),
+        },
+        "verificacoes": records,
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def _periodo_label(ano, mes):
+    if pd.isna(ano) or pd.isna(mes):
+        return "sem período"
+    return f"{int(ano)}-{int(mes):02d}"
+
+
+def _expand(patterns):
+    paths = []
+    for p in patterns or []:
+        paths.extend(sorted(glob.glob(p)) or [p])
+    return list(dict.fromkeys(paths))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Validação em lote dos relatórios da Ouvidoria")
+    ap.add_argument("--tipologia", nargs="*", default=[], help="CSVs de tipologia (aceita glob)")
+    ap.add_argument("--totais", nargs="*", default=[], help="CSVs do crawler com total_* (aceita glob)")
+    ap.add_argument("-o", "--output", default="validacao_ouvidoria.json", help="Relatório (.json ou .csv)")
+    ap.add_argument("--max-variacao", type=float, default=0.5,
+                    help="Variação mês a mês máxima (fração) antes de marcar outlier")
+    ap.add_argument("--min-base", type=int, default=20,
+                    help="Valor mínimo do mês anterior para avaliar a variação")
+    args = ap.parse_args(argv)
+
+    tipologia = load_tipologia(_expand(args.tipologia))
+    totais = load_totais(_expand(args.totais))
+    if tipologia.empty and totais.empty:
+        raise SystemExit("Nenhum dado para validar. Informe --tipologia e/ou --totais.")
+
+    report = validate_batch(tipologia, totais, max_variacao=args.max_variacao, min_base=args.min_base)
+    out = write_validation_report(report, args.output)
+
+    falhas = report[report["status"] == "falha"]
+    for r in falhas.itertuples(index=False):
+        print(f"[WARN] {_periodo_label(r.ano, r.mes)} {r.verificacao} ({r.campo}): esperado={r.esperado} obtido={r.obtido}")
+    print(f"OK: {out} ({len(report)} verificações, {len(falhas)} falhas)")
+    return 1 if len(falhas) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,7 @@ Sempre retorna as 7 categorias + TOTAL GERAL (calculado se a linha não existir)
 
 Dependências:
   pip install pdfplumber pillow pytesseract
+  (opcional, OCR mais rápido em lote) pip install tesserocr
 Tesseract (necessário para PDFs imagem):
   Windows: instalar "Tesseract-OCR"
   Ubuntu: sudo apt install tesseract-ocr tesseract-ocr-por
@@ -16,6 +17,11 @@ Exemplo de uso:
   python pdf_ouvidoria_parser.py data/ouvidoria_2025_09.pdf --page-index 3 -o data/tipologia.csv
   (PDF imagem) adicionar:
   --force-ocr --tesseract "C:\Program Files\Tesseract-OCR\tesseract.exe"
+  Backend de OCR: --ocr-backend auto|tesserocr|pytesseract
+  (auto = tesserocr se instalado, mantendo uma instância do Tesseract viva no processo;
+   pytesseract abre um processo 'tesseract' por chamada e fica como fallback)
+  Cache de páginas rasterizadas (reexecuções com outro --lang/--debug-ocr-text não re-rasterizam):
+  --image-cache data/.ocr_cache
 
 Comando completo:
 python .\pdf_parsers\pdf_ouvidoria_parser.py .\data\ouvidoria_2025_09.pdf `
@@ -65,6 +71,114 @@ def try_import_pytesseract():
     except Exception:
         return None
 
+def try_import_tesserocr():
+    try:
+        import tesserocr
+        return tesserocr
+    except Exception:
+        return None
+
+
+OCR_BACKENDS = ("auto", "tesserocr", "pytesseract")
+TSV_INT_FIELDS = ["level","page_num","block_num","par_num","line_num","word_num",
+                  "left","top","width","height"]
+
+def _ocr_config(psm):
+    return fr'--oem 3 --psm {psm} -c preserve_interword_spaces=1'
+
+
+class PytesseractBackend:
+    """Fallback: um processo 'tesseract' por chamada (imagem vai por arquivo temporário)."""
+    name = "pytesseract"
+
+    def __init__(self, pytesseract, tesseract_cmd=None):
+        self.pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    def image_to_data(self, img, lang, psm):
+        return self.pytesseract.image_to_data(
+            img, lang=lang, config=_ocr_config(psm), output_type=self.pytesseract.Output.DICT
+        )
+
+
+class TesserocrBackend:
+    """
+    Mantém uma instância do Tesseract (libtesseract) viva por idioma dentro do processo.
+    A imagem PIL é passada em memória e o traineddata só é carregado uma vez.
+    Devolve o mesmo dict de image_to_data(output_type=DICT) do pytesseract.
+    """
+    name = "tesserocr"
+
+    def __init__(self, tesserocr, tessdata=None):
+        self.tesserocr = tesserocr
+        self.tessdata = tessdata
+        self._apis = {}
+
+    def _api(self, lang):
+        api = self._apis.get(lang)
+        if api is None:
+            kwargs = {"lang": lang, "oem": self.tesserocr.OEM.DEFAULT}
+            if self.tessdata:
+                kwargs["path"] = self.tessdata
+            api = self.tesserocr.PyTessBaseAPI(**kwargs)
+            api.SetVariable("preserve_interword_spaces", "1")
+            self._apis[lang] = api
+        return api
+
+    def image_to_data(self, img, lang, psm):
+        api = self._api(lang)
+        api.SetPageSegMode(psm)
+        api.SetImage(img)
+        tsv = api.GetTSVText(0) or ""
+        api.Clear()
+
+        data = {k: [] for k in TSV_INT_FIELDS + ["conf", "text"]}
+        for ln in tsv.splitlines():
+            cols = ln.split("\t", 11)
+            if len(cols) < 11:
+                continue
+            if len(cols) == 11:
+                cols.append("")
+            for k, v in zip(TSV_INT_FIELDS, cols[:10]):
+                data[k].append(int(v))
+            data["conf"].append(int(float(cols[10])))
+            data["text"].append(cols[11])
+        return data
+
+    def close(self):
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+_OCR_BACKEND_CACHE = {}
+
+def get_ocr_backend(name="auto", tesseract_cmd=None, tessdata=None):
+    """
+    Retorna o backend de OCR (reutilizado dentro do processo/worker).
+    'auto' usa tesserocr quando disponível e cai para pytesseract.
+    Retorna None se nenhum backend estiver instalado.
+    """
+    key = (name, tesseract_cmd, tessdata)
+    if key in _OCR_BACKEND_CACHE:
+        return _OCR_BACKEND_CACHE[key]
+
+    backend = None
+    if name in ("auto", "tesserocr"):
+        tesserocr = try_import_tesserocr()
+        if tesserocr is not None:
+            backend = TesserocrBackend(tesserocr, tessdata=tessdata)
+        elif name == "tesserocr":
+            print("[WARN] tesserocr não instalado (pip install tesserocr). Usando pytesseract.")
+    if backend is None:
+        pytesseract = try_import_pytesseract()
+        if pytesseract is not None:
+            backend = PytesseractBackend(pytesseract, tesseract_cmd=tesseract_cmd)
+
+    _OCR_BACKEND_CACHE[key] = backend
+    return backend
+
 def _expected_labels():
     return {
         "Pedido de acesso à informação": [
@@ -83,6 +197,29 @@ def _expected_labels():
         "Agradecimento": ["Agradecimento","Aqradecimento"],
     }
 
+def _label_key(s) -> str:
+    # chave de lookup: ascii minúsculo, sem marcas de nota (*1, *¹) e espaços colapsados
+    k = re.sub(r"\*+\d*", "", _ascii(str(s)))
+    return " ".join(k.split()).strip(" ._")
+
+def _canonical_label_map():
+    lookup = {_label_key(c): c for c in ORDER}
+    for canon, variants in _expected_labels().items():
+        for v in variants:
+            lookup[_label_key(v)] = canon
+    return lookup
+
+CANONICAL_LABELS = _canonical_label_map()
+
+def canonical_label(s) -> str:
+    """Rótulo canônico (ORDER) para uma variante conhecida; senão só normaliza espaços."""
+    return CANONICAL_LABELS.get(_label_key(s), " ".join(str(s).split()))
+
+def canonicalize_labels(series: pd.Series) -> pd.Series:
+    # uma passada: resolve cada rótulo distinto uma vez e mapeia a coluna inteira
+    s = series.astype(str)
+    return s.map({u: canonical_label(u) for u in s.unique()})
+
 def _build_fuzzy_label_regex(label_ascii: str) -> re.Pattern:
     import re
     tokens = [t for t in re.split(r"\s+", label_ascii.strip()) if t]
@@ -90,17 +227,69 @@ def _build_fuzzy_label_regex(label_ascii: str) -> re.Pattern:
     return re.compile(pattern, re.IGNORECASE)
 
 
-def find_candidate_pages(pdf, forced_index=None):
+def release_page(page):
+    """Descarta o layout/objetos em cache da página (pdfplumber guarda tudo até fechar o PDF)."""
+    close = getattr(page, "close", None)
+    if close is not None:
+        close()
+    else:
+        page.flush_cache()
+
+def iter_pages(pdf, indices=None):
+    """
+    Itera (índice, página) liberando o cache de cada página assim que ela é consumida,
+    para que a memória não cresça com o número de páginas do documento.
+    """
+    for i in (range(len(pdf.pages)) if indices is None else indices):
+        page = pdf.pages[i]
+        try:
+            yield i, page
+        finally:
+            release_page(page)
+
+def _extract_text_range(job):
+    # roda no worker: abre o PDF por conta própria e extrai só o seu intervalo de páginas
+    pdf_path, start, stop, kwargs = job
+    pdfplumber = import_pdfplumber()
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text(**kwargs) or "" for _, page in iter_pages(pdf, range(start, stop))]
+
+def extract_pages_text(pdf_path, workers=None, min_pages_per_worker=4, **kwargs):
+    """
+    Texto de todas as páginas, na ordem. Com workers > 1 divide as páginas em faixas
+    contíguas entre processos (o layout do pdfminer é CPU-bound); docs curtos rodam em série.
+    `workers` None/0 = os.cpu_count().
+    """
+    import os
+    pdfplumber = import_pdfplumber()
+    with pdfplumber.open(pdf_path) as pdf:
+        n = len(pdf.pages)
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, n // max(1, min_pages_per_worker)))
+    if workers == 1:
+        return _extract_text_range((pdf_path, 0, n, kwargs))
+
+    from concurrent.futures import ProcessPoolExecutor
+    step = -(-n // workers)
+    jobs = [(str(pdf_path), a, min(a + step, n), kwargs) for a in range(0, n, step)]
+    texts = []
+    with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+        for chunk in ex.map(_extract_text_range, jobs):
+            texts.extend(chunk)
+    return texts
+
+def find_candidate_pages(pdf, forced_index=None, texts=None):
     if forced_index is not None and 0 <= forced_index < len(pdf.pages):
         return [forced_index]
+    if texts is None:
+        texts = [page.extract_text() or "" for _, page in iter_pages(pdf)]
     cands = []
-    for i, page in enumerate(pdf.pages):
-        t = page.extract_text() or ""
+    for i, t in enumerate(texts):
         if HEADER_RX.search(t) and TOTAL_GERAL_RX.search(t):
             cands.append(i)
     if not cands:
-        for i, page in enumerate(pdf.pages):
-            t = page.extract_text() or ""
+        for i, t in enumerate(texts):
             if HEADER_RX.search(t):
                 cands.append(i)
     if not cands and len(pdf.pages) >= 4:
@@ -252,31 +441,111 @@ def _numeric_tokens(data, min_digits=1, img_w=1000):
 def _overlap(a_top, a_bot, b_top, b_bot):
     return not (a_bot <= b_top or b_bot <= a_top)
 
-def parse_by_ocr(page, lang_list, tesseract_cmd=None, debug_txt_path=None) -> pd.DataFrame:
-    pytesseract = try_import_pytesseract()
-    if pytesseract is None:
-        return pd.DataFrame()
-    if tesseract_cmd:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+OCR_DPI = 420
+OCR_CONTRAST = 1.6
+OCR_SHARPNESS = 1.3
+
+
+def file_sha256(path, chunk_size=1 << 20) -> str:
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PageImageCache:
+    """
+    Cache em disco das páginas rasterizadas + pré-processadas para OCR (PNG comprimido).
+    Chave: (hash do PDF, índice da página, DPI, parâmetros de pré-processamento).
+    Eviction LRU pelo mtime do arquivo (atualizado a cada acerto).
+    """
+
+    def __init__(self, cache_dir, max_entries=256):
+        from pathlib import Path
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+    def _path(self, pdf_hash, page_index, dpi, contrast, sharpness):
+        name = f"{pdf_hash[:32]}_p{page_index}_d{dpi}_c{contrast:g}_s{sharpness:g}.png"
+        return self.dir / name
+
+    def get(self, pdf_hash, page_index, dpi, contrast, sharpness):
+        path = self._path(pdf_hash, page_index, dpi, contrast, sharpness)
+        if not path.exists():
+            return None
+        try:
+            from PIL import Image
+            with Image.open(path) as im:
+                im.load()
+                img = im.copy()
+            path.touch()
+            return img
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, pdf_hash, page_index, dpi, contrast, sharpness, img):
+        import os
+        path = self._path(pdf_hash, page_index, dpi, contrast, sharpness)
+        tmp = path.with_suffix(".tmp")
+        img.save(tmp, format="PNG", optimize=False, compress_level=6)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        entries = sorted(self.dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+        for old in entries[:max(0, len(entries) - self.max_entries)]:
+            old.unlink(missing_ok=True)
+
+
+def render_page_for_ocr(page, image_cache=None, pdf_hash=None,
+                        dpi=OCR_DPI, contrast=OCR_CONTRAST, sharpness=OCR_SHARPNESS):
+    """Rasteriza a página em grayscale com realce; usa o cache quando disponível."""
+    use_cache = image_cache is not None and pdf_hash is not None
+    page_index = page.page_number - 1
+    if use_cache:
+        cached = image_cache.get(pdf_hash, page_index, dpi, contrast, sharpness)
+        if cached is not None:
+            return cached
 
-    # rasterização em grayscale
     try:
-        img = page.to_image(resolution=420).original
+        img = page.to_image(resolution=dpi).original
     except Exception:
-        return pd.DataFrame()
+        return None
 
     from PIL import ImageOps, ImageEnhance
     g = ImageOps.grayscale(img)
-    g = ImageEnhance.Contrast(g).enhance(1.6)
-    g = ImageEnhance.Sharpness(g).enhance(1.3)
-    b = g
+    g = ImageEnhance.Contrast(g).enhance(contrast)
+    g = ImageEnhance.Sharpness(g).enhance(sharpness)
+
+    if use_cache:
+        try:
+            image_cache.put(pdf_hash, page_index, dpi, contrast, sharpness, g)
+        except Exception as e:
+            print(f"[WARN] Falha ao gravar cache de imagem: {e}")
+    return g
+
+
+def parse_by_ocr(page, lang_list, tesseract_cmd=None, debug_txt_path=None, backend=None,
+                 image_cache=None, pdf_hash=None) -> pd.DataFrame:
+    if backend is None:
+        backend = get_ocr_backend("auto", tesseract_cmd=tesseract_cmd)
+    if backend is None:
+        return pd.DataFrame()
+
+    # rasterização em grayscale (reaproveita o cache, se houver)
+    b = render_page_for_ocr(page, image_cache=image_cache, pdf_hash=pdf_hash)
+    if b is None:
+        return pd.DataFrame()
 
     base_psms = [6, 4, 11]
-    cfg = lambda psm: fr'--oem 3 --psm {psm} -c preserve_interword_spaces=1'
     labels_map = _expected_labels()
 
     def read_tsv(lang, psm):
-        return pytesseract.image_to_data(b, lang=lang, config=cfg(psm), output_type=pytesseract.Output.DICT)
+        return backend.image_to_data(b, lang, psm)
 
     last_data = None
     for lang in lang_list:
@@ -392,16 +661,7 @@ def parse_by_ocr(page, lang_list, tesseract_cmd=None, debug_txt_path=None) -> pd
 def normalize_and_sort(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
-    df["categoria"] = (
-        df["categoria"].astype(str)
-        .str.replace(r"\s+", " ", regex=True)
-        .str.replace("Solicitação de providências", "Solicitação de providência", regex=False)
-        .str.replace("Denúncia*1", "Denúncia", regex=False)
-        .str.replace("Denuncia*1", "Denúncia", regex=False)
-        .str.replace("Denúncia*¹", "Denúncia", regex=False)
-        .str.replace("Denuncia*¹", "Denúncia", regex=False)
-        .str.strip()
-    )
+    df["categoria"] = canonicalize_labels(df["categoria"])
     try:
         cat_type = pd.CategoricalDtype(ORDER, ordered=True)
         df["categoria"] = df["categoria"].astype(cat_type)
@@ -411,24 +671,40 @@ def normalize_and_sort(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("pdf", help="Caminho do PDF")
     ap.add_argument("-o","--output", default="tipologia_totais_p4.csv", help="CSV de saída")
     ap.add_argument("--force-ocr", action="store_true", help="Força OCR (Tesseract)")
     ap.add_argument("--lang", default="por", help="Idioma principal do OCR (ex.: por, eng)")
     ap.add_argument("--tesseract", default=None, help="Caminho completo do tesseract.exe")
+    ap.add_argument("--ocr-backend", choices=OCR_BACKENDS, default="auto",
+                    help="Backend de OCR: tesserocr (Tesseract persistente) ou pytesseract (fallback)")
+    ap.add_argument("--tessdata", default=None, help="Diretório tessdata (somente tesserocr)")
     ap.add_argument("--page-index", type=int, default=None, help="Força um índice de página (0-based)")
     ap.add_argument("--debug-ocr-text", default=None, help="Salva o texto OCR em um .txt (debug)")
-    args = ap.parse_args()
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Processos para extrair o texto das páginas em paralelo (0 = todos os núcleos)")
+    ap.add_argument("--image-cache", default=None,
+                    help="Diretório de cache das páginas rasterizadas (evita re-rasterizar entre execuções)")
+    ap.add_argument("--image-cache-max", type=int, default=256,
+                    help="Máximo de imagens no cache (LRU)")
+    args = ap.parse_args(argv)
 
     pdfplumber = import_pdfplumber()
+    ocr_backend = get_ocr_backend(args.ocr_backend, tesseract_cmd=args.tesseract, tessdata=args.tessdata)
+    image_cache, pdf_hash = None, None
+    if args.image_cache:
+        image_cache = PageImageCache(args.image_cache, max_entries=args.image_cache_max)
+        pdf_hash = file_sha256(args.pdf)
+    texts = None
+    if args.workers != 1 and args.page_index is None:
+        texts = extract_pages_text(args.pdf, workers=args.workers)
     with pdfplumber.open(args.pdf) as pdf:
-        pages = find_candidate_pages(pdf, forced_index=args.page_index)
+        pages = find_candidate_pages(pdf, forced_index=args.page_index, texts=texts)
         df_final = pd.DataFrame()
 
-        for idx in pages:
-            page = pdf.pages[idx]
+        for idx, page in iter_pages(pdf, pages):
 
             # 1) PRIMEIRA TENTATIVA: LAYOUT (mais robusto neste PDF)
             df = parse_by_layout(page)
@@ -438,7 +714,7 @@ def main():
 
             # 2) Se não deu por layout e não forçar OCR, tente texto simples filtrado
             if not args.force_ocr:
-                t = page.extract_text() or ""
+                t = texts[idx] if texts else (page.extract_text() or "")
                 df = parse_from_text(t)
                 if not df.empty:
                     df_final = df
@@ -448,7 +724,9 @@ def main():
             langs = [args.lang] if args.lang else []
             if "eng" not in langs:
                 langs.append("eng")
-            df = parse_by_ocr(page, langs, tesseract_cmd=args.tesseract, debug_txt_path=args.debug_ocr_text)
+            df = parse_by_ocr(page, langs, tesseract_cmd=args.tesseract,
+                              debug_txt_path=args.debug_ocr_text, backend=ocr_backend,
+                              image_cache=image_cache, pdf_hash=pdf_hash)
             if not df.empty:
                 df_final = df
                 break
@@ -0,0 +1,156 @@
+"""
+Cliente HTTP compartilhado pelos crawlers.
+
+- Session com pool de conexões dimensionado (HTTPAdapter)
+- Retry com backoff exponencial + jitter apenas em métodos idempotentes (GET/HEAD)
+- Respeita o cabeçalho Retry-After (429/503)
+- Rate limit por host (token bucket), para não sermos bloqueados pelo portal do Metrô
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0 Safari/537.36")
+
+DEFAULT_TIMEOUT = 30
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+BACKOFF_MAX = 60
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# host → (requisições por segundo, rajada máxima)
+HOST_RATE_LIMITS = {
+    "transparencia.metrosp.com.br": (2.0, 4),
+    "www.metro.sp.gov.br": (2.0, 4),
+}
+DEFAULT_RATE_LIMIT = (5.0, 10)
+
+
+class JitterRetry(Retry):
+    """
+    Retry do urllib3 com 'full jitter' no backoff exponencial.
+
+    As novas tentativas acontecem dentro de um único urlopen (um único send() do adapter);
+    `before_retry(host)`, se definido, é chamado depois da espera e antes de cada uma delas,
+    para que o rate limit por host valha também para os retries.
+    """
+
+    before_retry = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.before_retry = self.before_retry
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response=response, error=error,
+                                  _pool=_pool, _stacktrace=_stacktrace)
+        retry._host = (getattr(_pool, "host", None) or "").lower()
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.before_retry is not None:
+            self.before_retry(getattr(self, "_host", ""))
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, min(BACKOFF_MAX, backoff))
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter que consome um token do bucket do host antes de cada envio e de cada retry."""
+
+    def __init__(self, *args, **kwargs):
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+        if isinstance(self.max_retries, JitterRetry):
+            self.max_retries = self.max_retries.new()
+            self.max_retries.before_retry = self._acquire
+
+    def _bucket(self, host):
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(*HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+                self._buckets[host] = bucket
+            return bucket
+
+    def _acquire(self, host):
+        self._bucket(host).acquire()
+
+    def send(self, request, **kwargs):
+        self._acquire((urlparse(request.url).hostname or "").lower())
+        return super().send(request, **kwargs)
+
+
+def build_session(retries=MAX_RETRIES, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    retry = JitterRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = RateLimitedAdapter(max_retries=retry, pool_connections=pool_connections,
+                                 pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session():
+    """Session única do processo (pool e buckets compartilhados entre os crawlers)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = build_session()
+        return _SESSION
+
+
+def get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().get(url, timeout=timeout, **kwargs)
@@ -0,0 +1,105 @@
+"""
+Arquivo bruto das respostas baixadas pelos crawlers, endereçado por conteúdo.
+
+  data/raw/objects/ab/abcdef....zst   corpo da resposta comprimido com zstd (nome = sha256 do corpo)
+  data/raw/manifest.jsonl             uma linha por download: url, fonte, data, status, headers, sha256
+
+O mesmo conteúdo baixado várias vezes vira um único objeto; o manifest guarda cada busca.
+Com isso os parsers podem ser reexecutados sobre o histórico sem acessar o portal.
+O diretório pode ser trocado com a variável METRO_RAW_ARCHIVE_DIR.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).resolve().parents[1] / "data" / "raw"
+ZSTD_LEVEL = 10
+
+_MANIFEST_LOCK = threading.Lock()
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except Exception as e:
+        raise RuntimeError("Instale zstandard: pip install zstandard") from e
+
+
+def _archive_dir(archive_dir=None) -> Path:
+    """Diretório do arquivo: o argumento, senão METRO_RAW_ARCHIVE_DIR (lida a cada chamada), senão data/raw."""
+    return Path(archive_dir or os.environ.get("METRO_RAW_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR)
+
+
+def _object_path(sha, archive_dir):
+    return Path(archive_dir) / "objects" / sha[:2] / f"{sha}.zst"
+
+
+def archive_bytes(content, url, source, headers=None, status=None, fetched_at=None, archive_dir=None):
+    """Grava o conteúdo (se ainda não existir) e acrescenta a busca ao manifest. Retorna o sha256."""
+    archive_dir = _archive_dir(archive_dir)
+    sha = hashlib.sha256(content).hexdigest()
+
+    path = _object_path(sha, archive_dir)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(_zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(content))
+        os.replace(tmp, path)
+
+    headers = dict(headers or {})
+    entry = {
+        "sha256": sha,
+        "url": url,
+        "fonte": source,
+        "baixado_em": fetched_at or datetime.now().isoformat(timespec="seconds"),
+        "status": status,
+        "content_type": headers.get("Content-Type") or headers.get("content-type"),
+        "tamanho": len(content),
+        "headers": headers,
+    }
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _MANIFEST_LOCK:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        with open(archive_dir / "manifest.jsonl", "a", encoding="utf-8") as f:
+            f.write(line)
+    return sha
+
+
+def archive_response(response, source, archive_dir=None):
+    """
+    Arquiva uma resposta do requests. Nunca interrompe o crawler:
+    em caso de erro só avisa e retorna None.
+    """
+    try:
+        return archive_bytes(response.content, response.url, source,
+                             headers=response.headers, status=response.status_code,
+                             archive_dir=archive_dir)
+    except Exception as e:
+        print(f"Aviso: não consegui arquivar {getattr(response, 'url', '?')}: {e}")
+        return None
+
+
+def read_object(sha, archive_dir=None) -> bytes:
+    """Conteúdo original (descomprimido) de um objeto do arquivo."""
+    data = _object_path(sha, _archive_dir(archive_dir)).read_bytes()
+    return _zstd().ZstdDecompressor().decompress(data)
+
+
+def iter_manifest(source=None, archive_dir=None):
+    """Entradas do manifest, na ordem em que foram gravadas (opcionalmente só de uma fonte)."""
+    path = _archive_dir(archive_dir) / "manifest.jsonl"
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for ln in f:
+            ln = ln.strip()
+            if not ln:
+                continue
+            entry = json.loads(ln)
+            if source is None or entry.get("fonte") == source:
+                yield entry
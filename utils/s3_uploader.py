@@ -1,7 +1,8 @@
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
-
 def upload_to_s3(file_path, bucket_name, s3_key):
+    # boto3 é pesado de importar; só paga quem realmente faz upload
+    import boto3
+    from botocore.exceptions import ClientError, NoCredentialsError
+
     s3 = boto3.client("s3")
     try:
         s3.upload_file(file_path, bucket_name, s3_key)